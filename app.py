@@ -1,14 +1,23 @@
 # app.py — 상임위 의안 대시보드 (위원회 선택: 과방위 or 국토위)
 # - 22대 시작일(2024-05-30) 기본 필터
 # - 한 번만 데이터 수집 → 선택한 위원회만 렌더
-# - 표: 열 폭 px 고정 / '소관위' 그룹 헤더 / 가운데 정렬 / 법률안명 2줄 클램프
-# - NaN/None → '-' 처리 / CSV 다운로드 / 캐시(10분)
+# - 표: 열 폭 px 고정 / '소관위' 그룹 헤더 / 가운데 정렬 / 긴 법률안명은 말줄임 + 툴팁
+# - NaN/None → '-' 처리 / CSV 다운로드 / 캐시(페이지별 ETag + parquet 스냅샷 10분 + cache_resource)
 # - 로컬(.env) 우선, 없으면 st.secrets 사용
 
-import os, requests, pandas as pd, certifi, html as _html
+import os, io, re, glob, math, sqlite3, requests, numpy as np, pandas as pd, pyarrow as pa, certifi
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
+from st_aggrid import AgGrid, DataReturnMode, JsCode
+
+try:   # orjson이 있으면 bytes를 바로 파싱(더 빠름), 없으면 표준 json
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 # ======================
 # 기본 셋업 (.env, SSL)
@@ -19,6 +28,8 @@ try:
 except NameError:
     BASE_DIR = os.getcwd()
 load_dotenv(os.path.join(BASE_DIR, ".env"))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")   # 일자별 parquet 스냅샷
+PAGE_DB   = os.path.join(CACHE_DIR, "pages.sqlite")   # 페이지별 ETag + 응답 본문
 
 def env_or_secret(key: str, default=None):
     """로컬 .env → 없으면 st.secrets → 둘 다 없으면 default"""
@@ -44,6 +55,10 @@ K22_START = pd.Timestamp("2024-05-30")
 DEFAULT_START     = K22_START
 DEFAULT_PSIZE     = 100
 DEFAULT_MAXPAGES  = 200
+FETCH_WORKERS     = 8      # 동시에 요청할 페이지 수
+API_RETRY_SEC     = 300    # API 실패 후 이 시간 동안은 재호출 없이 저장된 스냅샷 사용
+DATA_TTL_SEC      = 600    # 데이터 신선도 — 이보다 오래된 스냅샷은 재수집 (ETag 덕에 변경 없으면 본문 전송 없음)
+SNAPSHOT_KEEP     = 2      # 보관할 parquet 스냅샷 수 (최신순, 새로고침 실패 시 폴백용으로 이전 것 하나 유지)
 COMMITTEES        = ["과학기술정보방송통신위원회", "국토교통위원회"]
 
 # ======================
@@ -74,232 +89,404 @@ with st.sidebar:
 # ======================
 # 유틸
 # ======================
-def bill_detail_link(row: dict) -> str:
-    link = row.get("DETAIL_LINK")
-    if link and isinstance(link, str) and link.strip():
-        return link
-    bill_id = row.get("BILL_ID")
-    return f"https://likms.assembly.go.kr/bill/billDetail.do?billId={bill_id}" if bill_id else ""
-
-def _fetch_page(page: int, size: int, age: int, api_key: str):
+@st.cache_resource
+def get_session() -> requests.Session:
+    """공유 세션(rerun에도 유지): keep-alive로 TCP/TLS 연결 재사용 + gzip 응답 + 일시 오류 재시도"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip"})
+    return session
+
+class APIError(RuntimeError):
+    """국회 API가 오류 코드/해석 불가 응답을 돌려줌"""
+
+@st.cache_resource
+def _init_page_db() -> bool:
+    """페이지 캐시 DB 디렉터리/테이블을 프로세스당 한 번만 생성 (실패 시 예외 → 캐시되지 않아 다음 수집 때 재시도)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    con = sqlite3.connect(PAGE_DB, timeout=5)
+    try:
+        with con:
+            con.execute("CREATE TABLE IF NOT EXISTS pages (age INTEGER, page INTEGER, size INTEGER, "
+                        "etag TEXT, body BLOB, PRIMARY KEY (age, page, size))")
+    finally:
+        con.close()
+    return True
+
+def _page_cache_get(age: int, page: int, size: int):
+    """저장된 (etag, body) — 없거나 DB 오류면 None (캐시는 최선 노력, 실패해도 수집은 계속)"""
+    try:
+        con = sqlite3.connect(PAGE_DB, timeout=5)
+        try:
+            return con.execute("SELECT etag, body FROM pages WHERE age=? AND page=? AND size=?",
+                               (age, page, size)).fetchone()
+        finally:
+            con.close()
+    except (sqlite3.Error, OSError):
+        return None
+
+def _page_cache_put(age: int, page: int, size: int, etag: str, body: bytes):
+    """(etag, body) 저장 — DB 오류는 무시"""
+    try:
+        con = sqlite3.connect(PAGE_DB, timeout=5)
+        try:
+            with con:
+                con.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", (age, page, size, etag, body))
+        finally:
+            con.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+def _fetch_page(session: requests.Session, page: int, size: int, age: int, api_key: str, use_cache: bool = False):
+    """한 페이지 요청 → (rows, list_total_count 또는 None)
+    use_cache면 저장된 ETag로 If-None-Match 조건부 요청 → 304면 본문 없이 저장된 응답 재사용"""
     params = {"KEY": api_key, "Type": "json", "pIndex": page, "pSize": size, "AGE": age}
-    r = requests.get(BASE_URL, params=params, timeout=30)
-    r.raise_for_status()
-    js = r.json()
-    # RESULT 체크
-    if isinstance(js, dict) and "RESULT" in js:
-        code = js["RESULT"].get("CODE")
-        msg  = js["RESULT"].get("MESSAGE")
-        if code != "INFO-000":
-            raise RuntimeError(f"[국회API 오류] {code} - {msg}")
-    block = next((b for b in js.get(DATA_ID, []) if isinstance(b, dict) and "row" in b), {})
-    return block.get("row", [])
-
-@st.cache_data(ttl=600, show_spinner=False)
+    cached = _page_cache_get(age, page, size) if use_cache else None
+    headers = {"If-None-Match": cached[0]} if cached else None
+    r = session.get(BASE_URL, params=params, headers=headers, timeout=30)
+    if r.status_code == 304 and cached:
+        js = _json_loads(cached[1])
+    else:
+        r.raise_for_status()
+        try:
+            js = _json_loads(r.content)
+        except ValueError as e:
+            raise APIError("[국회API 오류] JSON 응답 해석 실패") from e
+        # RESULT 체크
+        if isinstance(js, dict) and "RESULT" in js:
+            code = js["RESULT"].get("CODE")
+            msg  = js["RESULT"].get("MESSAGE")
+            if code != "INFO-000":
+                raise APIError(f"[국회API 오류] {code} - {msg}")
+        # 정상 응답만 저장 (ETag를 주지 않는 서버면 저장 생략)
+        etag = r.headers.get("ETag")
+        if use_cache and etag:
+            _page_cache_put(age, page, size, etag, r.content)
+    blocks = [b for b in js.get(DATA_ID, []) if isinstance(b, dict)]
+    head = next((b["head"] for b in blocks if "head" in b), [])
+    total = next((h["list_total_count"] for h in head if isinstance(h, dict) and "list_total_count" in h), None)
+    block = next((b for b in blocks if "row" in b), {})
+    return block.get("row", []), total
+
+def _probe_pages(ex: ThreadPoolExecutor, fetch, first_page: int, max_pages: int, page_size: int):
+    """전체 건수를 모를 때: FETCH_WORKERS개씩 요청, 짧은 페이지가 나오면 중단"""
+    for start in range(first_page, max_pages + 1, FETCH_WORKERS):
+        window = range(start, min(start + FETCH_WORKERS, max_pages + 1))
+        # map은 페이지 순서를 보존
+        for rows in ex.map(fetch, window):
+            yield rows
+            if len(rows) < page_size:
+                return
+
 def fetch_all_rows(age: int, api_key: str, page_size: int, max_pages: int):
-    """여러 페이지 수집(10분 캐시) — 최신부터 과거로 충분히 긁어옴"""
-    acc, total = [], 0
-    for p in range(1, max_pages + 1):
-        rows = _fetch_page(p, page_size, age, api_key)
-        if not rows:
-            break
-        total += len(rows)
-        acc.extend(rows)
-        if len(rows) < page_size:
-            break
+    """여러 페이지 수집 — 1페이지의 list_total_count로 페이지 수를 정하고 나머지는 병렬 요청"""
+    session = get_session()   # 메인 스레드에서 한 번 조회 → 워커 스레드가 같은 커넥션 풀 공유
+    try:
+        use_cache = _init_page_db()
+    except (sqlite3.Error, OSError):
+        use_cache = False     # 디스크/DB 문제면 페이지 캐시 없이 수집
+    first, list_total = _fetch_page(session, 1, page_size, age, api_key, use_cache)
+    acc = list(first)
+    fetch = lambda p: _fetch_page(session, p, page_size, age, api_key, use_cache)[0]
+    if list_total is not None:
+        n_pages = min(max_pages, math.ceil(int(list_total) / page_size))
+        if n_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, n_pages - 1)) as ex:
+                # map은 페이지 순서를 보존
+                for rows in ex.map(fetch, range(2, n_pages + 1)):
+                    acc.extend(rows)
+    elif len(first) == page_size:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+            for rows in _probe_pages(ex, fetch, 2, max_pages, page_size):
+                acc.extend(rows)
+    total = len(acc)
     fetched_at = datetime.now()
     return acc, total, fetched_at
 
+# 사용하는 API 필드 / 날짜 컬럼
+API_FIELDS = ["BILL_NAME", "PROPOSE_DT", "RST_PROPOSER", "PROPOSER", "CMT_PRESENT_DT", "CMT_PROC_DT",
+              "CMT_PROC_RESULT_CD", "DETAIL_LINK", "BILL_ID", "COMMITTEE"]
+DATE_COLS  = ["제안일", "소관위상정일", "소관위처리일"]
+DETAIL_URL = "https://likms.assembly.go.kr/bill/billDetail.do?billId="
+
+def _blank_to_na(s: pd.Series, strip: bool = False) -> pd.Series:
+    """빈 문자열 → NA (원본의 `or` 폴백과 동일, strip=True면 공백뿐인 값도) — Arrow string으로 바로 변환해 object 왕복 없음"""
+    s = s.astype("string[pyarrow]")
+    return s.mask((s.str.strip() if strip else s).eq(""))
+
+def _parse_date(s: pd.Series) -> pd.Series:
+    """날짜 문자열 → datetime — YYYY-MM-DD 고정 포맷으로 한 번에 파싱하고,
+    실패한 행(YYYYMMDD/공백/시각 포함 등)만 하이픈을 넣어 다시 파싱"""
+    out = pd.to_datetime(s, format="%Y-%m-%d", errors="coerce", cache=True)
+    miss = out.isna().to_numpy()
+    if miss.any():
+        t = s[miss]
+        t = t[t.astype(bool).to_numpy()]   # None/빈 문자열은 그대로 NaT
+        if len(t):
+            t = t.astype("string").str.strip()
+            t = t.where(t.str.contains("-", regex=False, na=True), t.str[:4] + "-" + t.str[4:6] + "-" + t.str[6:8])
+            out[t.index] = pd.to_datetime(t.str[:10], format="%Y-%m-%d", errors="coerce")
+    return out
+
 def build_dataframe(rows: list) -> pd.DataFrame:
     """원본 rows → 표시용 DataFrame(날짜는 datetime으로 보관)"""
     if not rows:
         return pd.DataFrame()
-    df = pd.DataFrame([{
-        "법률안명": r.get("BILL_NAME"),
-        "제안일": r.get("PROPOSE_DT"),
-        "대표발의": (r.get("RST_PROPOSER") or r.get("PROPOSER")),
-        "소관위상정일": r.get("CMT_PRESENT_DT"),
-        "소관위처리일": r.get("CMT_PROC_DT"),
-        "소관위처리결과": r.get("CMT_PROC_RESULT_CD"),
-        "상세보기": bill_detail_link(r),
-        "소관위원회": r.get("COMMITTEE"),
-    } for r in rows])
-
-    # 날짜 파싱
-    for col in ["제안일", "소관위상정일", "소관위처리일"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-    # 정렬(최신 제안일 우선)
-    if "제안일" in df.columns:
-        df = df.sort_values("제안일", ascending=False)
+    raw = pd.DataFrame.from_records(rows, columns=API_FIELDS)
+    # 컬럼 단위로 한 번에 조립 (행마다 dict를 만들지 않음)
+    df = pd.DataFrame({
+        "법률안명": raw["BILL_NAME"].astype("string[pyarrow]"),
+        "제안일": raw["PROPOSE_DT"],
+        # 대표발의: RST_PROPOSER가 비면 PROPOSER 그대로 (`RST_PROPOSER or PROPOSER`를 컬럼 단위 combine_first로)
+        "대표발의": _blank_to_na(raw["RST_PROPOSER"]).combine_first(raw["PROPOSER"].astype("string[pyarrow]")),
+        "소관위상정일": raw["CMT_PRESENT_DT"],
+        "소관위처리일": raw["CMT_PROC_DT"],
+        "소관위처리결과": raw["CMT_PROC_RESULT_CD"],
+        # 상세보기: DETAIL_LINK 없으면 BILL_ID로 조합
+        "상세보기": _blank_to_na(raw["DETAIL_LINK"], strip=True).fillna(
+            DETAIL_URL + _blank_to_na(raw["BILL_ID"])).fillna(""),
+        "소관위원회": raw["COMMITTEE"],
+    })
+
+    # 날짜 파싱 (세 컬럼 일괄)
+    df[DATE_COLS] = df[DATE_COLS].apply(_parse_date)
+
+    # 정렬(최신 제안일 우선) — int64 뷰의 비트 반전(~)을 안정 argsort → 내림차순, NaT(최솟값)는 맨 뒤
+    order = np.argsort(~df["제안일"].to_numpy().view("i8"), kind="stable")
+    df = df.take(order)
+
+    # 저카디널리티 문자열 → category (비교/필터가 정수 코드 연산)
+    for col in ["소관위원회", "소관위처리결과"]:
+        df[col] = df[col].astype("category")
 
     return df
 
-def filter_dataframe(df: pd.DataFrame, committee: str, start_date, search_kw: str):
-    """소관위/시작일/검색어 필터 — 22대 시작일을 기본값으로 강제 반영"""
+def _since_len(df: pd.DataFrame, ts) -> int:
+    """제안일 내림차순 정렬을 이용 — 제안일 >= ts 인 앞쪽 행 수를 이진 탐색(O(log n))으로 계산
+    (~int64는 오름차순, NaT는 맨 뒤라 자동 제외)"""
+    arr = df["제안일"].to_numpy()
+    cut = np.datetime64(pd.Timestamp(ts)).astype(arr.dtype).view("i8")
+    return int(np.searchsorted(~arr.view("i8"), ~cut, side="right"))
+
+def _parquet_path(age: int, date_str: str, page_size: int, max_pages: int) -> str:
+    return os.path.join(CACHE_DIR, f"bills_{age}_{date_str}_{page_size}x{max_pages}.parquet")
+
+@st.cache_resource(ttl=DATA_TTL_SEC, max_entries=4, show_spinner=False)
+def get_df(age: int, date_str: str, _api_key: str, page_size: int, max_pages: int):
+    """parquet 스냅샷(DATA_TTL_SEC 이내) → 없거나 오래됐으면 API 수집 후 저장 → (분석용 df, 표시용 스냅샷, 수집 시각)
+    cache_resource는 복사 없이 같은 객체를 돌려주므로 호출부는 필터/선택(.loc 등)만 하고 수정하지 말 것
+    (_api_key는 캐시 키에서 제외 → 키를 바꿔도 캐시 유지, 지난 날짜/설정 항목은 max_entries로 밀려남)"""
+    path = _parquet_path(age, date_str, page_size, max_pages)
+    if os.path.exists(path) and datetime.now().timestamp() - os.path.getmtime(path) < DATA_TTL_SEC:
+        df, fetched_at = pd.read_parquet(path), datetime.fromtimestamp(os.path.getmtime(path))
+    else:
+        rows, _, fetched_at = fetch_all_rows(age, _api_key, page_size, max_pages)
+        df = build_dataframe(rows)
+        if not df.empty:
+            _save_snapshot(df, path, age)
+    return df, (build_display(df) if not df.empty else pd.DataFrame()), fetched_at
+
+def _save_snapshot(df: pd.DataFrame, path: str, age: int):
+    """parquet 스냅샷 저장 + 오래된 것 정리 — 디스크 문제로 실패해도 이미 수집한 df는 그대로 사용 (경고만)"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(path, compression="zstd")
+        _prune_snapshots(age)
+    except (OSError, pa.ArrowException) as e:
+        try:
+            os.remove(path)   # 쓰다 만 파일이 다음 실행에서 읽히지 않도록
+        except OSError:
+            pass
+        st.warning(f"스냅샷 저장 실패 — 이번 데이터는 캐시 없이 표시합니다. ({type(e).__name__})")
+
+def _prune_snapshots(age: int):
+    """최신 SNAPSHOT_KEEP개만 남기고 오래된 parquet 스냅샷 삭제"""
+    paths = sorted(glob.glob(os.path.join(CACHE_DIR, f"bills_{age}_*.parquet")), key=os.path.getmtime, reverse=True)
+    for old in paths[SNAPSHOT_KEEP:]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+@st.cache_resource(ttl=API_RETRY_SEC, show_spinner=False)
+def load_stale_snapshot(age: int, page_size: int, max_pages: int):
+    """API 실패 시 대체용 — 같은 pSize×페이지 설정의 최신 parquet 스냅샷, 없으면 다른 설정 중 최신
+    → (df, 표시용 스냅샷, 수집 시각, 같은 설정 여부) 또는 None (rerun마다 다시 읽지 않도록 캐시)"""
+    same = glob.glob(os.path.join(CACHE_DIR, f"bills_{age}_*_{page_size}x{max_pages}.parquet"))
+    paths = same or glob.glob(os.path.join(CACHE_DIR, f"bills_{age}_*.parquet"))
+    if not paths:
+        return None
+    path = max(paths, key=os.path.getmtime)
+    df = pd.read_parquet(path)
+    return df, build_display(df), datetime.fromtimestamp(os.path.getmtime(path)), bool(same)
+
+@st.cache_resource
+def _api_failures() -> dict:
+    """세션 공용 API 실패 기록 {(age, 날짜, pSize, 페이지 수): (실패 시각, 오류 메시지)}
+    — get_df와 같은 키로 기록해 실패한 설정만 잠시 재호출 생략"""
+    return {}
+
+def _safe_error(e: Exception) -> str:
+    """화면 표시용 오류 메시지 — requests/urllib3 메시지에 포함된 요청 URL의 KEY 값 가림"""
+    return f"{type(e).__name__}: " + re.sub(r"KEY=[^&\s'\"]*", "KEY=***", str(e))
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def filter_dataframe(_df: pd.DataFrame, df_key: str, committee: str, start_date, search_kw: str):
+    """소관위/시작일/검색어 필터 — 22대 시작일을 기본값으로 강제 반영
+    (_df는 해시하지 않음 → df_key로 캐시 구분, 탭 전환 시 재필터링 생략)"""
+    df = _df
     if df.empty:
         return df
-    # 소관위
-    if committee:
-        df = df[df["소관위원회"] == committee]
-    # 시작일
+    # 시작일 — 정렬된 앞부분 슬라이스(복사 없는 뷰)
     start_ts = pd.Timestamp(start_date) if start_date else K22_START
     if "제안일" in df.columns:
-        df = df[df["제안일"] >= start_ts]
-    # 검색어(법률안명 OR 대표발의)
+        df = df.iloc[:_since_len(df, start_ts)]
+    # 소관위 / 검색어(법률안명 OR 대표발의) 조건을 numpy 불리언 배열 하나로 합쳐 한 번만 선택
+    # (Series 연산의 인덱스 정렬/래핑 없이 배열끼리 &=, |)
+    mask = np.ones(len(df), dtype=bool)
+    if committee:
+        cmt = df["소관위원회"]
+        if isinstance(cmt.dtype, pd.CategoricalDtype):
+            # category 코드(정수) 비교 — 목록에 없는 위원회면 전부 False
+            cats = cmt.cat.categories
+            mask &= (cmt.cat.codes.to_numpy() == cats.get_loc(committee)) if committee in cats else False
+        else:
+            mask &= (cmt.to_numpy() == committee)
     if search_kw:
-        mask = pd.Series(False, index=df.index)
-        for col in ["법률안명", "대표발의"]:
-            if col in df.columns:
-                mask |= df[col].fillna("").astype(str).str.contains(search_kw, case=False)
-        df = df[mask]
-    return df
+        # string dtype이라 fillna/astype 복사 없이 na=False로 결측 처리
+        pat = re.escape(search_kw)
+        mask &= (df["법률안명"].str.contains(pat, case=False, na=False, regex=True).to_numpy(dtype=bool)
+                 | df["대표발의"].str.contains(pat, case=False, na=False, regex=True).to_numpy(dtype=bool))
+    return df if mask.all() else df.loc[mask]
+
+# HTML 이스케이프 변환표 — 속성값용(html.escape(quote=True)와 동일) / 본문용(quote=False와 동일)
+# Series.str.translate로 컬럼 단위 한 번에 적용 (replace 3~5회 대신 한 번의 패스)
+_ESC_QUOTE   = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+_ESC_NOQUOTE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """UTF-8(BOM) CSV를 BytesIO에 바로 기록 — 중간 str 생성/재인코딩 없음"""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8-sig")
+    return buf.getvalue()
 
 # ======================
-# 표 렌더링 (px 고정폭 + 그룹 헤더 + 가운데 정렬 + 2줄 클램프)
+# 표 렌더링 (px 고정폭 + 그룹 헤더 + 가운데 정렬 + 긴 법률안명 말줄임)
 # ======================
-def render_table(df: pd.DataFrame, title: str, *, height_px: int = 500):
+# 표 공통 CSS — 실행마다 페이지에 한 번만 주입 (표마다 반복하지 않음)
+TABLE_CSS = """<style>
+.billwrap {
+  overflow-y: auto;
+  border: 1px solid #e5e7eb;
+  border-radius: 8px;
+}
+table.billtable {
+  border-collapse: collapse;
+  width: max-content;
+  table-layout: fixed;
+  font-size: 14px;
+}
+table.billtable th, table.billtable td {
+  border: 1px solid #ddd;
+  padding: 8px;
+  vertical-align: middle;
+  text-align: center;
+  overflow: hidden;
+  white-space: normal;
+  word-wrap: break-word;
+  overflow-wrap: anywhere;
+}
+table.billtable th { background: #f6f6f6; }
+table.billtable tr:nth-child(even) { background: #fbfbfb; }
+</style>"""
+
+DISPLAY_COLS = ["법률안명","제안일","대표발의","소관위상정일","소관위처리일","소관위처리결과","상세보기"]
+CMT_COLS     = ["소관위상정일","소관위처리일","소관위처리결과"]   # '소관위' 그룹 헤더 아래 컬럼
+
+# 열 너비(px)
+COL_WIDTH_PX = {
+    "법률안명": 280,
+    "제안일": 110,
+    "대표발의": 110,
+    "소관위상정일": 110,
+    "소관위처리일": 110,
+    "소관위처리결과": 140,
+    "상세보기": 110,
+}
+
+# 법률안명 최대 표시 글자 수 (280px 열에서 약 2줄) — 넘으면 서버에서 잘라 '…' + 전체 제목 툴팁
+NAME_MAX = 40
+
+# 고정 컬럼이므로 colgroup / 2단 헤더는 한 번만 생성
+TABLE_COLGROUP = "<colgroup>" + "".join(f'<col style="width:{COL_WIDTH_PX[c]}px" />' for c in DISPLAY_COLS) + "</colgroup>"
+TABLE_THEAD = (
+    "<thead><tr>"
+    + "".join(f"<th rowspan='2'>{c}</th>" for c in ["법률안명","제안일","대표발의"])
+    + f"<th colspan='{len(CMT_COLS)}'>소관위</th><th rowspan='2'>상세보기</th>"
+    + "</tr><tr>"
+    + "".join(f"<th>{c.replace('소관위','')}</th>" for c in CMT_COLS)
+    + "</tr></thead>"
+)
+
+def _fmt_date(s: pd.Series) -> pd.Series:
+    """datetime → 'YYYY-MM-DD' (NaT → '-') — 일 단위 정수(datetime64[D])로 내려 고유 날짜만 포맷 후 역인덱스로 펼침"""
+    days = s.to_numpy().astype("datetime64[D]")
+    uniq, inv = np.unique(days, return_inverse=True)
+    labels = np.datetime_as_string(uniq, unit="D").astype(object)
+    labels[np.isnat(uniq)] = "-"
+    return pd.Series(labels[inv.ravel()], index=s.index)
+
+def build_display(df: pd.DataFrame) -> pd.DataFrame:
+    """표시용 스냅샷(df와 같은 index) — 날짜 문자열/'-' 채움(CSV용) + 셀 HTML(<컬럼>_html, 표용)을 한 번에 계산"""
+    disp = pd.DataFrame({
+        **{c: _fmt_date(df[c]) for c in DATE_COLS},
+        **{c: df[c].astype(object).fillna("-") for c in ["법률안명","대표발의","소관위처리결과","상세보기"]},
+    }, index=df.index)[DISPLAY_COLS]
+
+    # 셀 HTML — 컬럼 단위로 이스케이프 (날짜는 이스케이프 불필요)
+    for c in ["법률안명","대표발의","소관위처리결과","상세보기"]:
+        text = disp[c].astype(str)
+        if c == "법률안명":
+            # 짧은 제목은 본문만, 긴 제목만 잘라서 title 툴팁에 전체 제목 (제목을 두 번 싣는 행 최소화)
+            long_ = text.str.len() > NAME_MAX
+            disp[f"{c}_html"] = text.str.translate(_ESC_NOQUOTE).where(
+                ~long_, '<span title="' + text.str.translate(_ESC_QUOTE) + '">'
+                        + text.str.slice(0, NAME_MAX).str.translate(_ESC_NOQUOTE) + "…</span>")
+        elif c == "상세보기":
+            disp[f"{c}_html"] = ('<a href="' + text.str.translate(_ESC_QUOTE) + '" target="_blank">바로가기</a>'
+                                 ).where(text.ne("") & text.ne("-"), "-")
+        else:
+            disp[f"{c}_html"] = text.str.translate(_ESC_NOQUOTE)
+    return disp
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def table_csv(_df: pd.DataFrame, csv_key: str) -> bytes:
+    """표 CSV bytes — csv_key가 같으면 재직렬화 생략"""
+    return _csv_bytes(_df[DISPLAY_COLS])
+
+def render_table(df: pd.DataFrame, title: str, *, filter_key: str, height_px: int = 500):
+    """build_display 스냅샷의 행 부분집합을 표 + CSV 다운로드로 렌더
+    (표는 모두 제안일 내림차순 필터 결과의 앞부분이므로 filter_key + 행 수로 CSV 캐시를 구분)"""
     st.subheader(title)
     if df.empty:
         st.info("표시할 데이터가 없습니다.")
         return
 
-    show = df.copy()
+    # 셀 HTML은 build_display에서 미리 계산됨 → (행 × 조각) object 배열에 태그/셀을 번갈아 채우고 join 한 번
+    # (중간 행 문자열을 만들지 않음, 태그 사이 공백 없음 → 마크다운 코드블록 해석 방지)
+    parts = np.empty((len(df), 2 * len(DISPLAY_COLS) + 1), dtype=object)
+    parts[:, 0::2] = ["<tr><td>"] + ["</td><td>"] * (len(DISPLAY_COLS) - 1) + ["</td></tr>"]
+    for i, c in enumerate(DISPLAY_COLS):
+        parts[:, 2 * i + 1] = df.get(f"{c}_html", df[c]).to_numpy(dtype=object)
+    tbody = "".join(parts.ravel().tolist())
+    table_html = f'<table class="billtable">{TABLE_COLGROUP}{TABLE_THEAD}<tbody>{tbody}</tbody></table>'
 
-    # 표 컬럼 순서
-    cols = ["법률안명","제안일","대표발의","소관위상정일","소관위처리일","소관위처리결과","상세보기"]
-    cols = [c for c in cols if c in show.columns]
-    show = show[cols].copy()
-
-    # 날짜 → 문자열, 결측치 '-'
-    for c in ["제안일","소관위상정일","소관위처리일"]:
-        if c in show.columns:
-            show[c] = show[c].dt.strftime("%Y-%m-%d")
-            show[c] = show[c].fillna("-")
-    for c in ["법률안명","대표발의","소관위처리결과","상세보기"]:
-        if c in show.columns:
-            show[c] = show[c].fillna("-")
-
-    # 링크
-    if "상세보기" in show.columns:
-        show["상세보기"] = show["상세보기"].apply(
-            lambda url: f'<a href="{_html.escape(url, quote=True)}" target="_blank">바로가기</a>'
-            if isinstance(url, str) and url and url != "-" else "-"
-        )
-
-    # 열 너비(px)
-    col_width_px = {
-        "법률안명": 280,
-        "제안일": 110,
-        "대표발의": 110,
-        "소관위상정일": 110,
-        "소관위처리일": 110,
-        "소관위처리결과": 140,
-        "상세보기": 110,
-    }
-
-    style = f"""
-    <style>
-      .billwrap {{
-        max-height: {height_px}px;
-        overflow-y: auto;
-        border: 1px solid #e5e7eb;
-        border-radius: 8px;
-      }}
-      table.billtable {{
-        border-collapse: collapse;
-        width: max-content;
-        table-layout: fixed;
-        font-size: 14px;
-      }}
-      table.billtable th, table.billtable td {{
-        border: 1px solid #ddd;
-        padding: 8px;
-        vertical-align: middle;
-        text-align: center;
-        overflow: hidden;
-        white-space: normal;
-        word-wrap: break-word;
-        overflow-wrap: anywhere;
-      }}
-      table.billtable th {{ background: #f6f6f6; }}
-      table.billtable tr:nth-child(even) {{ background: #fbfbfb; }}
-      .clamp2 {{
-        display: -webkit-box;
-        -webkit-line-clamp: 2;
-        -webkit-box-orient: vertical;
-        overflow: hidden;
-        line-height: 1.2em;
-        max-height: calc(1.2em * 2);
-      }}
-    </style>
-    """
-
-    def _colgroup_html(ordered_cols):
-        parts = []
-        for c in ordered_cols:
-            w = col_width_px.get(c, 120)
-            parts.append(f'<col style="width:{w}px" />')
-        return "<colgroup>" + "".join(parts) + "</colgroup>"
-
-    has_grp = all(c in show.columns for c in ["소관위상정일","소관위처리일","소관위처리결과"])
-    header_row1, header_row2, ordered = [], [], []
-
-    for c in ["법률안명","제안일","대표발의"]:
-        if c in show.columns:
-            ordered.append(c)
-            header_row1.append(f"<th rowspan='2'>{c}</th>")
-
-    if has_grp:
-        span = sum(1 for c in ["소관위상정일","소관위처리일","소관위처리결과"] if c in show.columns)
-        header_row1.append(f"<th colspan='{span}'>소관위</th>")
-        for sub in ["소관위상정일","소관위처리일","소관위처리결과"]:
-            if sub in show.columns:
-                ordered.append(sub)
-                header_row2.append(f"<th>{sub.replace('소관위','')}</th>")
-    else:
-        for sub in ["소관위상정일","소관위처리일","소관위처리결과"]:
-            if sub in show.columns:
-                ordered.append(sub)
-                header_row1.append(f"<th rowspan='2'>{sub}</th>")
-
-    if "상세보기" in show.columns:
-        ordered.append("상세보기")
-        header_row1.append("<th rowspan='2'>상세보기</th>")
-
-    body_rows = []
-    for _, r in show.iterrows():
-        tds = []
-        for c in ordered:
-            v = r[c]
-            if c == "법률안명":
-                safe = _html.escape(str(v), quote=False) if "<a " not in str(v) else str(v)
-                tds.append(f'<td title="{_html.escape(str(v), quote=True)}"><div class="clamp2">{safe}</div></td>')
-            else:
-                if c == "상세보기" and isinstance(v, str) and v.startswith("<a "):
-                    tds.append(f"<td>{v}</td>")
-                else:
-                    tds.append(f"<td>{_html.escape(str(v), quote=False)}</td>")
-        body_rows.append("<tr>" + "".join(tds) + "</tr>")
-
-    table_html = f"""
-    <table class="billtable">
-      {_colgroup_html(ordered)}
-      <thead>
-        <tr>{''.join(header_row1)}</tr>
-        <tr>{''.join(header_row2)}</tr>
-      </thead>
-      <tbody>
-        {''.join(body_rows)}
-      </tbody>
-    </table>
-    """
-
-    st.components.v1.html(style + f'<div class="billwrap">{table_html}</div>', height=height_px + 70, scrolling=False)
+    # iframe 없이 페이지에 직접 렌더
+    st.markdown(f'<div class="billwrap" style="max-height:{height_px}px">{table_html}</div>', unsafe_allow_html=True)
 
     # CSV 다운로드
-    csv_bytes = show[ordered].to_csv(index=False, encoding="utf-8-sig").encode("utf-8-sig")
+    csv_bytes = table_csv(df, f"{filter_key}|{len(df)}")
     st.download_button(
         label="⬇️ 이 표를 CSV로 다운로드",
         data=csv_bytes,
@@ -307,6 +494,55 @@ def render_table(df: pd.DataFrame, title: str, *, height_px: int = 500):
         mime="text/csv"
     )
 
+# ======================
+# 월별 그리드 (AgGrid — 보이는 행만 렌더)
+# ======================
+LINK_RENDERER = JsCode("""
+class LinkRenderer {
+  init(params) {
+    this.eGui = document.createElement('span');
+    if (params.value && params.value !== '-') {
+      const a = document.createElement('a');
+      a.href = params.value;
+      a.target = '_blank';
+      a.innerText = '바로가기';
+      this.eGui.appendChild(a);
+    } else {
+      this.eGui.innerText = '-';
+    }
+  }
+  getGui() { return this.eGui; }
+}
+""")
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def month_frame(_df: pd.DataFrame, _disp: pd.DataFrame, df_hash: str) -> pd.DataFrame:
+    """월 컬럼을 붙인 그리드용 DataFrame — df_hash(필터 조건)가 같으면 재계산 생략"""
+    # 연월을 정수 키(YYYYMM)로 계산 → 고유 키만 'YYYY-MM' 문자열로 포맷 (dt.to_period보다 빠름)
+    d = _df["제안일"]
+    ym = d.dt.year * 100 + d.dt.month
+    labels = {k: f"{int(k) // 100}-{int(k) % 100:02d}" for k in ym.dropna().unique()}
+    grid_df = _disp.loc[_df.index, DISPLAY_COLS]
+    return grid_df.assign(월=ym.map(labels).fillna("-"))[["월", *DISPLAY_COLS]]
+
+_CENTER = {"textAlign": "center"}
+GRID_OPTIONS = {
+    "columnDefs": [
+        {"field": "월", "width": 100, "pinned": "left", "filter": True},
+        {"field": "법률안명", "width": COL_WIDTH_PX["법률안명"], "tooltipField": "법률안명", "filter": True},
+        {"field": "제안일", "width": COL_WIDTH_PX["제안일"], "cellStyle": _CENTER},
+        {"field": "대표발의", "width": COL_WIDTH_PX["대표발의"], "cellStyle": _CENTER, "filter": True},
+        {"headerName": "소관위", "children": [
+            {"field": c, "headerName": c.replace("소관위", ""), "width": COL_WIDTH_PX[c], "cellStyle": _CENTER}
+            for c in CMT_COLS
+        ]},
+        {"field": "상세보기", "width": COL_WIDTH_PX["상세보기"], "cellStyle": _CENTER, "cellRenderer": LINK_RENDERER},
+    ],
+    "defaultColDef": {"resizable": True, "sortable": True},
+    "rowBuffer": 10,
+    "suppressColumnVirtualisation": False,
+}
+
 # ======================
 # 메인 로직 (한 번만 수집 → 선택한 위원회만 렌더)
 # ======================
@@ -314,46 +550,82 @@ if not API_KEY:
     st.error("`.env`의 NA_OPEN_API_KEY가 비어 있습니다. (클라우드에서는 Secrets에 설정하세요)")
     st.stop()
 
+today_str = datetime.now().strftime("%Y%m%d")
+if clicked_refresh:
+    get_df.clear()
+    try:   # 다른 세션의 스냅샷 정리와 겹칠 수 있으므로 존재 확인 대신 예외로 처리
+        os.remove(_parquet_path(AGE, today_str, int(page_size), int(max_pages)))
+    except FileNotFoundError:
+        pass
+
+failures = _api_failures()
+fetch_key = (AGE, today_str, int(page_size), int(max_pages))   # get_df 캐시 키와 동일
 if clicked_refresh:
-    fetch_all_rows.clear()
+    failures.pop(fetch_key, None)
 
 with st.spinner("데이터 불러오는 중..."):
-    try:
-        rows, total_cnt, fetched_at = fetch_all_rows(AGE, API_KEY, int(page_size), int(max_pages))
-    except Exception as e:
-        st.exception(e)
-        st.stop()
-
-st.caption(f"총 수집: {total_cnt}건 • 캐시 시각: {fetched_at.strftime('%Y-%m-%d %H:%M:%S')} • pSize={page_size}")
+    last_fail = failures.get(fetch_key)
+    if last_fail and datetime.now() - last_fail[0] < timedelta(seconds=API_RETRY_SEC):
+        err = last_fail[1]   # 최근 실패 → API 재호출(재시도·타임아웃 대기) 없이 바로 스냅샷
+    else:
+        try:
+            df_all, disp_all, fetched_at = get_df(AGE, today_str, API_KEY, int(page_size), int(max_pages))
+            err = None
+            failures.pop(fetch_key, None)
+        except (requests.RequestException, APIError) as e:   # 요청/API 오류만 폴백 (그 외 버그는 그대로 노출)
+            err = _safe_error(e)
+            failures[fetch_key] = (datetime.now(), err)
+    if err:
+        stale = load_stale_snapshot(AGE, int(page_size), int(max_pages))
+        if stale is None:
+            st.error(f"API 호출 실패 — 저장된 데이터도 없습니다. ({err})")
+            st.stop()
+        df_all, disp_all, fetched_at, same_settings = stale
+        note = "" if same_settings else " · 현재 pSize/페이지 수와 다른 설정으로 수집된 데이터"
+        st.warning(f"API 호출 실패 — 마지막으로 저장된 데이터({fetched_at.strftime('%Y-%m-%d %H:%M')}{note})를 표시합니다. ({err})")
+
+st.caption(f"총 수집: {len(df_all)}건 • 캐시 시각: {fetched_at.strftime('%Y-%m-%d %H:%M:%S')} • pSize={page_size}")
 
-df_all = build_dataframe(rows)
 if df_all.empty:
     st.warning("수집된 데이터가 없습니다. (API 응답이 비었거나 필드 구조가 변경되었을 수 있음)")
     st.stop()
 
-# 선택한 위원회만 필터 → 탭 3종 렌더
+# 선택한 위원회만 필터 → 선택한 보기(최근 1주/월별/전체) 렌더
 now = pd.Timestamp.now()
 one_week_ago = now - timedelta(days=7)
 
-df_c = filter_dataframe(df_all, committee_choice, start_date, search_kw)
+df_key = f"{AGE}:{fetched_at.isoformat()}"
+df_c = filter_dataframe(df_all, df_key, committee_choice, start_date, search_kw)
+filter_key = f"{df_key}|{committee_choice}|{start_date}|{search_kw}"   # 필터 결과 식별자
 
+st.markdown(TABLE_CSS, unsafe_allow_html=True)
 st.markdown(f"## {committee_choice}")
-tabs = st.tabs(["최근 1주", "월별", "전체 목록"])
+# st.tabs는 숨은 탭까지 매번 모두 렌더 → 라디오로 선택한 보기 하나만 렌더
+view = st.radio("보기", ["최근 1주", "월별", "전체 목록"], horizontal=True, key="view", label_visibility="collapsed")
 
-with tabs[0]:
-    df_week = df_c[df_c["제안일"] >= one_week_ago] if "제안일" in df_c.columns else pd.DataFrame()
-    render_table(df_week, f"최근 1주일 내 발의 법안 ({committee_choice})", height_px=500)
+if view == "최근 1주":
+    df_week = df_c.iloc[:_since_len(df_c, one_week_ago)] if "제안일" in df_c.columns else pd.DataFrame()
+    render_table(disp_all.loc[df_week.index], f"최근 1주일 내 발의 법안 ({committee_choice})",
+                 filter_key=filter_key, height_px=500)
 
-with tabs[1]:
+elif view == "월별":
     if df_c.empty or "제안일" not in df_c.columns:
         st.info("표시할 데이터가 없습니다.")
     else:
-        tmp = df_c.copy()
-        tmp["YYYY-MM"] = tmp["제안일"].dt.to_period("M").astype(str)
-        for ym, g in sorted(tmp.groupby("YYYY-MM"), key=lambda x: x[0], reverse=True):
-            render_table(g, f"{ym} 발의 법안 ({committee_choice})", height_px=(700 if ym == "2025-01" else 500))
+        st.subheader(f"월별 발의 법안 ({committee_choice})")
+        AgGrid(
+            month_frame(df_c, disp_all, filter_key),
+            gridOptions=GRID_OPTIONS,
+            height=700,
+            update_on=[],                                    # 필터/정렬 등 상호작용으로 rerun·행 데이터 회신 안 함
+            data_return_mode=DataReturnMode.MINIMAL,         # 회신값을 쓰지 않으므로 최소 응답만
+            fit_columns_on_grid_load=False,
+            enable_enterprise_modules=False,                 # 엔터프라이즈 번들 로드 생략
+            allow_unsafe_jscode=True,
+            key=f"monthly-grid-{filter_key}",
+        )
 
-with tabs[2]:
-    render_table(df_c, f"전체 목록 ({committee_choice})", height_px=700)
+else:
+    render_table(disp_all.loc[df_c.index], f"전체 목록 ({committee_choice})", filter_key=filter_key, height_px=700)
 
 st.success("완료")